@@ -0,0 +1,67 @@
+"""
+    benchmarks.bench_schema
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Schema-driven decoding versus generic decoding and validating afterwards
+"""
+
+from luatable import fromlua
+from luatable.schema import Schema, record, optional
+
+from .bench_transcode import make_source, report
+
+Item = record('Item', [
+    ('id', int), ('name', str), ('price', float), ('tags', [str]),
+    ('stats', {object: object}), ('note', optional(str))
+])
+
+def check(schema, value):
+    """
+    return the value converted to the schema, validating it the way code
+    using fromlua does
+    """
+    if schema is object:
+        return value
+    elif isinstance(schema, optional):
+        return None if value is None else check(schema.schema, value)
+    elif schema is float:
+        if type(value) not in (int, float):
+            raise TypeError('expect float')
+        return float(value)
+    elif isinstance(schema, type) and hasattr(schema, '_schema'):
+        if not isinstance(value, dict):
+            raise TypeError('expect %s' % schema.__name__)
+        fields = dict(schema._schema)
+        unknown = set(value) - set(fields)
+        if unknown:
+            raise TypeError('unknown fields %r' % unknown)
+        return schema(*[check(field, value.get(name))
+                        for name, field in schema._schema])
+    elif isinstance(schema, list):
+        if not isinstance(value, list):
+            raise TypeError('expect list')
+        return [check(schema[0], item) for item in value]
+    elif isinstance(schema, dict):
+        if isinstance(value, list):
+            value = dict(enumerate(value, 1))
+        if not isinstance(value, dict):
+            raise TypeError('expect dict')
+        value_schema, = schema.values()
+        return dict((key, check(value_schema, item))
+                    for key, item in value.items())
+    elif type(value) is not schema:
+        raise TypeError('expect %s' % schema.__name__)
+    return value
+
+def main(count=20000):
+    source = make_source(count)
+    schema = Schema([Item])
+    assert schema.decode(source) == check([Item], fromlua(source))
+    print('%d records, %.1f MiB of Lua' % (count, len(source) / 2.0 ** 20))
+
+    report('fromlua', fromlua, source)
+    report('fromlua+check', lambda src: check([Item], fromlua(src)), source)
+    report('Schema.decode', schema.decode, source)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+    benchmarks.bench_transcode
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Direct transcoding versus decoding to Python objects and encoding back
+"""
+
+import json
+import time
+import tracemalloc
+
+from luatable import fromlua, tolua, luatojson, jsontolua
+
+def make_source(count):
+    """
+    return a Lua table of item records like the generated game data files
+    """
+    records = []
+    for i in range(count):
+        records.append(
+            '{id=%d, name="item %d", price=%d.5, tags={"a", "b", "c"}, '
+            'stats={atk=%d, def=%d, [1]=true}}' % (i, i, i, i % 100, i % 7))
+    return '{\n' + ',\n'.join(records) + '\n}'
+
+def measure(function, source):
+    """
+    return the best time of some runs and the peak traced memory of one run
+    """
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        function(source)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    function(source)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+def report(title, function, source):
+    seconds, peak = measure(function, source)
+    print('%-28s %8.3f s %10.1f MiB' % (title, seconds, peak / 2.0 ** 20))
+
+def main(count=20000):
+    lua_source = make_source(count)
+    json_source = luatojson(lua_source)
+    print('%d records, %.1f MiB of Lua, %.1f MiB of JSON' %
+          (count, len(lua_source) / 2.0 ** 20, len(json_source) / 2.0 ** 20))
+
+    report('lua -> json, fromlua+dumps',
+           lambda src: json.dumps(fromlua(src), separators=(',', ':')),
+           lua_source)
+    report('lua -> json, luatojson', luatojson, lua_source)
+    report('json -> lua, loads+tolua',
+           lambda src: tolua(json.loads(src)), json_source)
+    report('json -> lua, jsontolua', jsontolua, json_source)
+
+if __name__ == '__main__':
+    main()
@@ -7,3 +7,6 @@
 
 from .parser import fromlua
 from .generator import tolua
+from .transcoder import luatojson, jsontolua
+from .validator import validate, check_file
+from .schema import Schema, record, optional
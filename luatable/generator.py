@@ -5,82 +5,262 @@
     Implements a Lua table generator (encoder)
 """
 
-import string
+import re
+
+from collections.abc import Iterable, Mapping
+
+from .parser import Parser
+
+class Newlines(dict):
+    """
+    the newline-and-indentation strings leading lines at each nesting level,
+    built on first use; an indent of None breaks no line at all
+    """
+
+    def __init__(self, indent=None):
+        dict.__init__(self)
+        if indent is None:
+            self._indent = ''
+        elif isinstance(indent, str):
+            self._indent = indent
+        else:
+            self._indent = ' ' * indent
+        self[0] = '' if indent is None else '\n'
+
+    def __missing__(self, level):
+        self[level] = self[level - 1] + self._indent
+        return self[level]
 
 class Generator:
 
-    def __init__(self, obj):
+    def __init__(self, obj, indent=None, sort_keys=False, bare_keys=False,
+                 trailing_comma=True, default=None):
         self._obj = obj
+        self._default = default
+        self._sort_keys = sort_keys
+        self._bare_keys = bare_keys
+        self._trailing_comma = trailing_comma
+        self._equal = '=' if indent is None else ' = '
+        self._newlines = Newlines(indent)
 
     def generate(self):
         """
         return the Lua representation of the object
         """
-        return self._generate(self._obj)
+        chunks = []
+        self._generate(self._obj, chunks, 0)
+        return ''.join(chunks)
 
-    def _generate(self, obj):
+    def _generate(self, obj, chunks, level):
         """
         the workhorse
         """
-        output = ''
         if obj is None:                         # nil
-            output += 'nil'
+            chunks.append('nil')
         elif isinstance(obj, bool):             # boolean
-            if obj == True:
-                output += 'true'
-            else:
-                output += 'false'
-        elif isinstance(obj, (int, float)):     # number
-            output += str(obj)
+            chunks.append('true' if obj else 'false')
+        elif isinstance(obj, int):              # number, IntEnum members too
+            chunks.append(int.__repr__(obj))
+        elif isinstance(obj, float):
+            chunks.append(float.__repr__(obj))
         elif isinstance(obj, str):              # string
-            output += '"'
-            output += self._generate_string(obj)
-            output += '"'
-        elif isinstance(obj, list):             # contains list fields only
-            output += '{'
-            for item in obj:
-                output += self._generate(item)
-                output += ','
-            output += '}'
+            chunks.append('"' + self._generate_string(obj) + '"')
+        elif isinstance(obj, (list, tuple)):    # contains list fields only
+            self._generate_list(obj, chunks, level)
         elif isinstance(obj, dict):             # contains record fields
-            output += '{'
-            for key, value in obj.items():
-                if not isinstance(key, (int, float, str)):
-                    message = "unsupported key type '%s'" % type(key)
-                    raise TypeError(message)
-                output += '['
-                output += self._generate(key)
-                output += ']'
-                output += '='
-                output += self._generate(value)
-                output += ','
-            output += '}'
+            self._generate_dict(obj, chunks, level)
+        elif isinstance(obj, Mapping):          # dict-like
+            self._generate_dict(obj, chunks, level)
+        elif isinstance(obj, (bytes, bytearray)):   # not a table of bytes
+            self._generate_default(obj, chunks, level)
+        elif self._buffer_coming(obj):          # array.array, numpy, ...
+            self._generate_buffer(obj, chunks, level)
+        elif isinstance(obj, Iterable):         # range, generator, set, ...
+            self._generate_list(obj, chunks, level)
         else:                                   # whatever
+            self._generate_default(obj, chunks, level)
+
+    def _generate_default(self, obj, chunks, level):
+        """
+        generate what the default function converts an unsupported object to
+        """
+        if self._default is None:
             raise TypeError("unsupported object type '%s'" % type(obj))
-        return output
+        self._generate(self._default(obj), chunks, level)
+
+    def _open_table(self, chunks, level):
+        """
+        open a table, return the separator to be put after each field
+        """
+        newline = self._newlines[level + 1]
+        chunks.append('{' + newline)
+        return ',' + newline
+
+    def _close_table(self, chunks, level):
+        """
+        close a table, replacing the separator after the last field
+        """
+        chunks[-1] = (',' if self._trailing_comma else '') + \
+            self._newlines[level] + '}'
+
+    def _generate_list(self, items, chunks, level):
+        """
+        generate a table with list fields from any iterable
+        """
+        separator = self._open_table(chunks, level)
+        start = len(chunks)
+        for item in items:
+            self._generate(item, chunks, level + 1)
+            chunks.append(separator)
+        if len(chunks) == start:
+            chunks[-1] = '{}'
+        else:
+            self._close_table(chunks, level)
+
+    # struct format characters of integer and floating point buffer items
+    _NUMERIC_FORMATS = set('bBhHiIlLqQnNefd')
+
+    @staticmethod
+    def _buffer_coming(obj):
+        """
+        check whether the object supports the buffer protocol with one or
+        more dimensions, a scalar like a ctypes pointer is no table
+        """
+        try:
+            return memoryview(obj).ndim > 0
+        except TypeError:
+            return False
+
+    def _generate_buffer(self, obj, chunks, level):
+        """
+        generate a table with list fields from a buffer-protocol array
+        """
+        view = memoryview(obj)
+        # the whole item format bar its byte order, so that '<d' is a number
+        # but 'Zd' (complex) or '&<i' (pointer) is not
+        item_format = view.format.lstrip('@=<>!')
+        tolist = getattr(obj, 'tolist', None)
+        values = list(obj) if tolist is None else tolist()
+        if view.ndim != 1 or item_format not in self._NUMERIC_FORMATS:
+            self._generate(values, chunks, level)  # nested or non-numeric
+        elif not values:
+            chunks.append('{}')
+        else:                                       # flat numbers, join them
+            separator = self._open_table(chunks, level)
+            chunks.append(separator.join(map(str, values)))
+            chunks.append(separator)
+            self._close_table(chunks, level)
+
+    _NAME = re.compile(r'[A-Za-z_][A-Za-z0-9_]*\Z')
+
+    def _generate_dict(self, obj, chunks, level):
+        """
+        generate a table with record fields
+        """
+        if not obj:
+            chunks.append('{}')
+            return
+
+        # keys 1..count go to the array part, which stops before a None value
+        # so that the table is not read back as a list with a nil in it
+        count = 0
+        try:
+            while obj.get(count + 1) is not None:
+                count += 1
+        except TypeError:   # a mapping of other keys, like os.environ
+            pass
+        if count == len(obj):
+            self._generate_list(map(obj.__getitem__, range(1, count + 1)),
+                                chunks, level)
+            return
+
+        separator = self._open_table(chunks, level)
+        for index in range(1, count + 1):
+            self._generate(obj[index], chunks, level + 1)
+            chunks.append(separator)
+
+        items = obj.items()
+        if count > 0:
+            items = [item for item in items
+                     if not self._in_array_part(item[0], count)]
+        if self._sort_keys:
+            items = sorted(items, key=self._sort_key)
+        for key, value in items:
+            self._generate_key(key, chunks, level)
+            chunks.append(self._equal)
+            self._generate(value, chunks, level + 1)
+            chunks.append(separator)
+        self._close_table(chunks, level)
+
+    def _generate_key(self, key, chunks, level):
+        """
+        generate the key of a record field
+        """
+        if not isinstance(key, (int, float, str)):
+            message = "unsupported key type '%s'" % type(key)
+            raise TypeError(message)
+        if (self._bare_keys and isinstance(key, str) and
+                self._NAME.match(key) and key not in Parser._KWORDS):
+            chunks.append(key)
+        else:
+            chunks.append('[')
+            self._generate(key, chunks, level + 1)
+            chunks.append(']')
+
+    @staticmethod
+    def _in_array_part(key, count):
+        """
+        check whether a key is one of 1..count
+        """
+        return (isinstance(key, (int, float)) and 1 <= key <= count and
+                key == int(key))
+
+    @staticmethod
+    def _sort_key(item):
+        """
+        order numeric keys before string keys
+        """
+        key = item[0]
+        return (isinstance(key, str), key)
 
     _ESCAPEES = {'\a': 'a', '\b': 'b', '\t': 't', '\n': 'n', '\v': 'v',
                  '\f': 'f', '\r': 'r',  '"': '"',  "'": "'", '\\': '\\'}
 
-    _PRINTABLE = set(string.printable)
+    # control characters, quotes and backslashes, which need escaping; any
+    # other character, non-ASCII ones included, is written as it is
+    _UNSAFE = re.compile(r'[\x00-\x1f\x7f"\'\\]')
 
     def _generate_string(self, s):
         """
         generate string contents
         """
-        output = ''
-        for char in s:
-            if char in self._ESCAPEES:
-                output += '\\' + self._ESCAPEES[char]
-            elif char in self._PRINTABLE:
-                output += char
-            else:
-                output += '\\x' + format(ord(char), 'x')
-        return output
-
-def tolua(obj):
+        if self._UNSAFE.search(s) is None:
+            return s
+        return self._UNSAFE.sub(self._generate_escapee, s)
+
+    def _generate_escapee(self, match):
+        """
+        generate an escape sequence for a matched character
+        """
+        char = match.group()
+        if char in self._ESCAPEES:
+            return '\\' + self._ESCAPEES[char]
+        else:
+            return '\\x' + format(ord(char), '02x')
+
+def tolua(obj, indent=None, sort_keys=False, bare_keys=False,
+          trailing_comma=True, default=None):
     """
     return the Lua representation of the given object
+
+    indent: a string or a number of spaces to indent nested fields with,
+            None for the compact single-line style
+    sort_keys: emit record fields ordered by key, numbers before strings
+    bare_keys: emit `name=` instead of `["name"]=` for identifier keys
+    trailing_comma: put a separator after the last field of a table
+    default: called with every unsupported object, its result is generated
+             instead; it should raise TypeError if it cannot convert one
     """
-    generator = Generator(obj)
+    generator = Generator(obj, indent, sort_keys, bare_keys, trailing_comma,
+                          default)
     return generator.generate()
@@ -5,16 +5,48 @@
     Implements a recursive descent Lua table parser (decoder)
 """
 
+import bisect
+import codecs
+import re
+
 class Parser:
 
     # end of source indicator
     _NOMORE = ''
 
-    def __init__(self, source):
+    def __init__(self, source, object_hook=None, array_hook=None,
+                 encoding=None):
+        if isinstance(source, (bytes, bytearray)):
+            source = self._decode(source, encoding)
         assert isinstance(source, str)
         self._source = source
-        self._index = 0
-        self._current = source[0] if len(source) > 0 else self._NOMORE
+        self._object_hook = object_hook
+        self._array_hook = array_hook
+        self._index = 1 if source.startswith('\ufeff') else 0  # skip BOM
+        self._line_starts = None    # indexed only when an error is located
+        if self._index < len(source):
+            self._current = source[self._index]
+        else:
+            self._current = self._NOMORE
+
+    # byte order marks, UTF-32 ones go before their UTF-16 prefixes
+    _BOMS = [
+        (codecs.BOM_UTF8,     'utf-8-sig'),
+        (codecs.BOM_UTF32_LE, 'utf-32'),
+        (codecs.BOM_UTF32_BE, 'utf-32'),
+        (codecs.BOM_UTF16_LE, 'utf-16'),
+        (codecs.BOM_UTF16_BE, 'utf-16')
+    ]
+
+    @classmethod
+    def _decode(cls, source, encoding=None):
+        """
+        decode bytes according to its BOM, the given encoding, or UTF-8
+        """
+        for bom, bom_encoding in cls._BOMS:
+            if source.startswith(bom):
+                return source.decode(bom_encoding)
+        return source.decode(encoding or 'utf-8')
 
     def _peak_next(self):
         """
@@ -327,9 +359,9 @@ class Parser:
         'then',  'true',  'until',    'while'
     }
 
-    def _parse_word(self, allow_bool=False, allow_nil=False):
+    def _read_word(self):
         """
-        parse a word (nil, true, false, or identifier)
+        read a word as it is, keywords included
         """
         assert self._word_coming()
 
@@ -338,6 +370,13 @@ class Parser:
         while self._current.isalnum() or self._current == '_':
             word += self._current
             self._take_next()
+        return word
+
+    def _parse_word(self, allow_bool=False, allow_nil=False):
+        """
+        parse a word (nil, true, false, or identifier)
+        """
+        word = self._read_word()
 
         not_allowed = self._KWORDS.copy()
         if allow_bool:
@@ -425,7 +464,7 @@ class Parser:
         if self._current == '[':
             self._take_next()
             self._skip_spaces()
-            key = self._parse_expression()
+            key = self._parse_key()
             self._skip_spaces()
             if self._current != ']':
                 raise SyntaxError("bad table: record filed expect ']'")
@@ -443,20 +482,30 @@ class Parser:
 
         return key, value
 
+    def _parse_key(self):
+        """
+        parse the expression of a bracketed key
+        """
+        return self._parse_expression()
+
     def _finalize_table(self, table, count):
         """
-        convert dict to list if no record field occurred
+        convert dict to list if no record field occurred, then apply hooks
         """
         if count['rec'] > 0:    # a dict, filter out nil values
             result = {}
             for key, value in table.items():
                 if value is not None:
                     result[key] = value
+            if self._object_hook is not None:
+                return self._object_hook(result)
             return result
         else:                   # list fields only, convert to a list
             result = []
             for i in range(count['lst']):
                 result.append(table[i + 1])
+            if self._array_hook is not None:
+                return self._array_hook(result)
             return result
 
     def _parse_expression(self):
@@ -488,22 +537,286 @@ class Parser:
         else:
             raise SyntaxError("bad expression: unexpected '%s'" % self._current)
 
-    def parse(self):
+    def _parse_statement_head(self):
         """
-        parse a given Lua representation to a Python object
+        parse the head of a `return exp` or `[local] Name = exp` statement,
+        return 'return' or the name, or None if no head is present
         """
+        if not self._word_coming():
+            return None
+
+        old_index = self._index
+        word = self._read_word()
+        if word == 'return':
+            return word
+        elif word == 'local':
+            self._skip_spaces()
+            if not self._word_coming():
+                raise SyntaxError("bad statement: expect a name after 'local'")
+            word = self._read_word()
+        elif word in {'nil', 'true', 'false'}:  # an expression, not a name
+            self._reset_index(old_index)
+            return None
+
+        if word in self._KWORDS:
+            raise SyntaxError("bad statement: '%s' not allowed here" % word)
         self._skip_spaces()
-        value = self._parse_expression()
+        if self._current != '=' or self._peak_next() == '=':
+            raise SyntaxError("bad statement: expect '=' after '%s'" % word)
+        self._take_next()
+        return word
+
+    def _expect_end(self):
+        """
+        check that nothing but spaces and comments remains
+        """
         self._skip_spaces()
         if self._current != self._NOMORE:
             raise SyntaxError("unexpected '%s'" % self._current)
+
+    # line breaks, a pair of different ones counts as a single break
+    _LINE_BREAK = re.compile(r'\n\r?|\r\n?')
+
+    def _locate(self, error):
+        """
+        fill in the position of the current index to a SyntaxError, as pos,
+        lineno, offset (colno as well) and the text of the line; line starts
+        are indexed on the first call, so parsing never pays for it
+        """
+        source = self._source
+        if self._line_starts is None:
+            self._line_starts = [0] + [match.end() for match in
+                                       self._LINE_BREAK.finditer(source)]
+        index = min(self._index, len(source))
+        lineno = bisect.bisect_right(self._line_starts, index)
+        start = self._line_starts[lineno - 1]
+        match = self._LINE_BREAK.search(source, start)
+        end = len(source) if match is None else match.start()
+        error.pos = index
+        error.lineno = lineno
+        error.offset = error.colno = index - start + 1
+        error.text = source[start:end]
+        return error
+
+    def parse(self):
+        """
+        parse a given Lua representation to a Python object
+        """
+        try:
+            self._skip_spaces()
+            value = self._parse_expression()
+            self._expect_end()
+        except SyntaxError as error:
+            raise self._locate(error)
+        return value
+
+    def parse_statement(self):
+        """
+        parse the expression of a single `return exp` or `[local] Name = exp`
+        statement to a Python object, a bare expression is accepted as well
+        """
+        try:
+            self._skip_spaces()
+            self._parse_statement_head()
+            self._skip_spaces()
+            value = self._parse_expression()
+            self._skip_spaces()
+            if self._current == ';':
+                self._take_next()
+            self._expect_end()
+        except SyntaxError as error:
+            raise self._locate(error)
         return value
 
-def fromlua(src):
+    def parse_chunk(self):
+        """
+        parse a chunk of `[local] Name = exp` statements and an optional final
+        `return exp` statement to a dict mapping names to Python objects, the
+        returned value, which can also be a name assigned before, goes under
+        the key 'return'
+        """
+        namespace = {}
+        try:
+            self._parse_statements(namespace)
+        except SyntaxError as error:
+            raise self._locate(error)
+        return namespace
+
+    def _parse_statements(self, namespace):
+        """
+        parse the statements of a chunk into the given namespace
+        """
+        self._skip_spaces()
+        while self._current != self._NOMORE:
+            name = self._parse_statement_head()
+            if name is None:
+                raise SyntaxError("bad chunk: unexpected '%s'" % self._current)
+            self._skip_spaces()
+            if name == 'return':
+                if self._current not in (';', self._NOMORE):
+                    namespace[name] = self._parse_returned_value(namespace)
+                    self._skip_spaces()
+                if self._current == ';':
+                    self._take_next()
+                self._expect_end()
+                break
+
+            value = self._parse_expression()
+            if value is None:  # assigning nil removes the name
+                namespace.pop(name, None)
+            else:
+                namespace[name] = value
+            self._skip_spaces()
+            if self._current == ';':
+                self._take_next()
+                self._skip_spaces()
+
+    def _parse_returned_value(self, namespace):
+        """
+        parse the expression of a return statement, which may be a name
+        """
+        if self._word_coming():
+            old_index = self._index
+            word = self._read_word()
+            if word in namespace:
+                return namespace[word]
+            self._reset_index(old_index)
+            if word not in self._KWORDS:
+                raise SyntaxError("bad chunk: undefined name '%s'" % word)
+        return self._parse_expression()
+
+class RegexParser(Parser):
+    """
+    a parser skipping spaces, comments and words, and reading plain strings
+    and decimal integers, with regular expressions instead of character by
+    character
+    """
+
+    def _jump(self, index):
+        """
+        move the index forward to the given one
+        """
+        self._index = index
+        if index < len(self._source):
+            self._current = self._source[index]
+        else:
+            self._current = self._NOMORE
+
+    _SPACES = re.compile(r'\s*')
+
+    def _skip_spaces(self):
+        """
+        skip whitespaces and comments
+        """
+        if not self._current.isspace() and self._current != '-':
+            return
+        while True:
+            self._jump(self._SPACES.match(self._source, self._index).end())
+            if not self._comment_coming():
+                break
+            self._skip_comment()
+
+    _LONG_BRACKET = re.compile(r'\[(=*)\[')
+
+    _NEWLINE = re.compile(r'[\n\r]')
+
+    def _skip_comment(self):
+        """
+        skip a short/long comment
+        """
+        assert self._comment_coming()
+        source = self._source
+        index = self._index + 2  # for '--'
+
+        match = self._LONG_BRACKET.match(source, index)
+        if match is not None:   # long comment
+            closing = ']' + match.group(1) + ']'
+            end = source.find(closing, match.end())
+            if end < 0:
+                self._jump(len(source))
+                raise SyntaxError('bad long comment')
+            self._jump(end + len(closing))
+            return
+
+        match = self._NEWLINE.search(source, index)
+        if match is None:       # short comment at the end
+            self._jump(len(source))
+        else:
+            self._jump(match.start())
+            self._skip_newline()
+
+    _WORD = re.compile(r'\w+')
+
+    def _read_word(self):
+        """
+        read a word as it is, keywords included
+        """
+        assert self._word_coming()
+        match = self._WORD.match(self._source, self._index)
+        self._jump(match.end())
+        return match.group()
+
+    _WORD_EQUAL = re.compile(r'\w+\s*=')
+
+    def _equal_behind_word(self):
+        """
+        check whether there is a '=' behind the current word
+        """
+        assert self._word_coming()
+        if self._WORD_EQUAL.match(self._source, self._index) is not None:
+            return True
+        return Parser._equal_behind_word(self)  # maybe behind a comment
+
+    # short strings without escape sequences
+    _PLAIN_STRINGS = {
+        '"': re.compile(r'"([^"\\\n\r]*)"'),
+        "'": re.compile(r"'([^'\\\n\r]*)'")
+    }
+
+    def _parse_string(self):
+        """
+        parse a literal short string, plain ones with a regular expression
+        """
+        assert self._string_coming()
+        match = self._PLAIN_STRINGS[self._current].match(self._source,
+                                                         self._index)
+        if match is None:
+            return Parser._parse_string(self)
+        self._jump(match.end())
+        return match.group(1)
+
+    _INTEGER = re.compile(r'[0-9]+(?![0-9.eExX])')
+
+    def _parse_number(self):
+        """
+        parse a number, decimal integers with a regular expression
+        """
+        assert self._number_coming()
+        match = self._INTEGER.match(self._source, self._index)
+        if match is None:
+            return Parser._parse_number(self)
+        self._jump(match.end())
+        return int(match.group())
+
+def fromlua(src, object_hook=None, array_hook=None, encoding=None,
+            statement=False, chunk=False):
     """
     return a reconstituted object from the given Lua representation
+
+    object_hook: called with every decoded dict, its result is used instead
+    array_hook: called with every decoded list, its result is used instead
+    encoding: the encoding of a bytes source without a BOM, UTF-8 by default
+    statement: accept a `return exp` or `[local] Name = exp` statement and
+               return the value of its expression
+    chunk: accept a sequence of `[local] Name = exp` statements ended by an
+           optional `return exp`, and return a dict of name to value, with
+           the returned value under 'return'
     """
-    if not isinstance(src, str):
-        raise TypeError('require a string to parse')
-    parser = Parser(src)
+    if not isinstance(src, (str, bytes, bytearray)):
+        raise TypeError('require a string or bytes to parse')
+    parser = Parser(src, object_hook, array_hook, encoding)
+    if chunk:
+        return parser.parse_chunk()
+    elif statement:
+        return parser.parse_statement()
     return parser.parse()
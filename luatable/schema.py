@@ -0,0 +1,393 @@
+"""
+    luatable.schema
+    ~~~~~~~~~~~~~~~
+
+    Implements schema-driven typed decoders
+"""
+
+import collections
+import re
+
+from .parser import RegexParser
+
+class _Record:
+    """
+    the base of record classes made by record(), slotted value objects
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *args):
+        if len(args) != len(self._fields):
+            raise TypeError('%s() takes %d arguments (%d given)' %
+                            (type(self).__name__, len(self._fields),
+                             len(args)))
+        for name, value in zip(self._fields, args):
+            setattr(self, name, value)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name)
+                   for name in self._fields)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '%s(%s)' % (type(self).__name__, ', '.join(
+            '%s=%r' % (name, getattr(self, name)) for name in self._fields))
+
+    def _asdict(self):
+        """
+        return a dict of field names to values
+        """
+        return collections.OrderedDict(
+            (name, getattr(self, name)) for name in self._fields)
+
+def record(name, fields, named_tuple=False):
+    """
+    return a new record class for schemas, its instances are built directly
+    by the decoder
+
+    fields: a list of (name, schema) pairs, in the order of arguments
+    named_tuple: make a collections.namedtuple instead of a slotted class
+    """
+    fields = tuple(fields)
+    names = tuple(field for field, _ in fields)
+    if named_tuple:
+        cls = collections.namedtuple(name, names)
+    else:
+        cls = type(name, (_Record,), {'__slots__': names, '_fields': names})
+    cls._schema = fields
+    return cls
+
+class optional:
+    """
+    a schema of a value that may also be nil, decoded as None
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+
+    def __repr__(self):
+        return 'optional(%s)' % _describe(self.schema)
+
+def _describe(schema):
+    """
+    return the text of a schema for error messages
+    """
+    if isinstance(schema, list):
+        return '[%s]' % _describe(schema[0])
+    elif isinstance(schema, dict):
+        (key, value), = schema.items()
+        return '{%s: %s}' % (_describe(key), _describe(value))
+    elif isinstance(schema, optional):
+        return repr(schema)
+    elif schema is object:
+        return 'any'
+    else:
+        return schema.__name__
+
+# Lua names of the types of decoded values, numbers as math.type names them
+_LUA_TYPES = {type(None): 'nil', bool: 'boolean', int: 'integer',
+              float: 'float', str: 'string', dict: 'table', list: 'table'}
+
+# Python types accepted by scalar schemas
+_SCALARS = {int: (int,), float: (float, int), str: (str,), bool: (bool,)}
+
+# a record field not given yet
+_MISSING = object()
+
+class _SchemaParser(RegexParser):
+    """
+    a parser driven by decoders compiled from a schema, tables are read
+    field by field by the decoders, which build the declared objects in
+    place of dicts and lists
+    """
+
+    def _mismatch(self, schema, value, start):
+        """
+        return a TypeError of a decoded value not matching the schema, and go
+        back to where the value starts
+        """
+        self._reset_index(start)
+        return TypeError('bad value: expect %s, got %s' % (
+            _describe(schema), _LUA_TYPES.get(type(value), 'table')))
+
+    def _begin_table(self, schema):
+        """
+        enter a table, which must be coming
+        """
+        if not self._table_coming():
+            start = self._index
+            raise self._mismatch(schema, self._parse_expression(), start)
+        self._take_next()  # for '{'
+        self._skip_spaces()
+
+    def _end_of_table(self):
+        """
+        check whether the current table is closed, leave it if so
+        """
+        if self._current == '}':
+            self._take_next()
+            return True
+        elif self._current == self._NOMORE:
+            raise SyntaxError("bad table: expect '}'")
+        return False
+
+    def _skip_separator(self):
+        """
+        skip the separator after a field, unless the table is closing
+        """
+        self._skip_spaces()
+        if self._in_sequence(self._current, ',;'):
+            self._take_next()
+            self._skip_spaces()
+        elif self._current != '}':
+            raise SyntaxError("bad table: unexpected '%s'" % self._current)
+
+    _NAME_EQUAL = re.compile(r'(\w+)\s*=')
+
+    def _parse_field_head(self):
+        """
+        parse the key and the '=' of a record field, return None and parse
+        nothing if a list field is coming
+        """
+        if self._word_coming():
+            start = self._index
+            match = self._NAME_EQUAL.match(self._source, start)
+            if match is not None:   # no comment in between
+                word = match.group(1)
+                self._jump(match.end() - 1)
+            else:
+                word = self._read_word()
+                self._skip_spaces()
+                if self._current != '=':
+                    self._reset_index(start)
+                    return None
+            if word in self._KWORDS:
+                self._reset_index(start)
+                raise SyntaxError("bad word: '%s' not allowed here" % word)
+        elif self._current == '[' and not self._long_string_coming():
+            self._take_next()
+            self._skip_spaces()
+            word = self._parse_key()
+            # only support number or string as key
+            if not isinstance(word, (int, float, str)):
+                raise TypeError("bad table: unsupported key type '%s'" %
+                                type(word))
+            self._skip_spaces()
+            if self._current != ']':
+                raise SyntaxError("bad table: record filed expect ']'")
+            self._take_next()
+            self._skip_spaces()
+            if self._current != '=':
+                raise SyntaxError("bad table: record filed expect '='")
+        else:
+            return None
+        self._take_next()  # for '='
+        self._skip_spaces()
+        return word
+
+    def decode(self, decoder, statement=False):
+        """
+        decode a given Lua representation with the decoder of a schema
+        """
+        try:
+            self._skip_spaces()
+            if statement:
+                self._parse_statement_head()
+                self._skip_spaces()
+            value = decoder(self)
+            if statement:
+                self._skip_spaces()
+                if self._current == ';':
+                    self._take_next()
+            self._expect_end()
+        except SyntaxError as error:
+            raise self._locate(error)
+        except TypeError as error:
+            self._locate(error)
+            error.args = ('%s (line %d)' % (error.args[0], error.lineno),)
+            raise
+        return value
+
+class Schema:
+    """
+    a schema compiled once to a tree of decoders, each of which parses one
+    value of its part of the schema and checks its type on the way
+
+    int, float, str, bool: a number (integral for int), string or boolean
+    object: any value, decoded as by fromlua
+    [schema]: a table of list fields only, decoded as a list
+    {key_schema: value_schema}: a table of any fields, decoded as a dict,
+                                fields with nil values are left out
+    optional(schema): the same as schema, or nil decoded as None
+    a record class: a table of record fields named as those of the record,
+                    missing optional fields are None
+    """
+
+    def __init__(self, schema):
+        self._schema = schema
+        self._decoders = {}     # decoders of records, by class
+        self._decoder = self._compile(schema)
+
+    def __repr__(self):
+        return 'Schema(%s)' % _describe(self._schema)
+
+    def decode(self, src, encoding=None, statement=False):
+        """
+        return the object of the given Lua representation, raise TypeError
+        if it does not match the schema
+
+        encoding, statement: the same as those of fromlua
+        """
+        if not isinstance(src, (str, bytes, bytearray)):
+            raise TypeError('require a string or bytes to decode')
+        parser = _SchemaParser(src, encoding=encoding)
+        return parser.decode(self._decoder, statement)
+
+    def _compile(self, schema):
+        """
+        return the decoder of a schema
+        """
+        if isinstance(schema, type) and schema in _SCALARS:
+            return self._compile_scalar(schema)
+        elif schema is object:
+            return lambda parser: parser._parse_expression()
+        elif isinstance(schema, list) and len(schema) == 1:
+            return self._compile_list(schema)
+        elif isinstance(schema, dict) and len(schema) == 1:
+            return self._compile_dict(schema)
+        elif isinstance(schema, optional):
+            return self._compile_optional(schema)
+        elif isinstance(schema, type) and hasattr(schema, '_schema'):
+            if schema not in self._decoders:
+                self._decoders[schema] = self._compile_record(schema)
+            return self._decoders[schema]
+        raise TypeError('unsupported schema %r' % (schema,))
+
+    @staticmethod
+    def _compile_scalar(schema):
+        """
+        return the decoder of a number, string or boolean
+        """
+        types = _SCALARS[schema]
+        convert = float if schema is float else None
+
+        def decode(parser):
+            start = parser._index
+            value = parser._parse_expression()
+            if type(value) not in types:
+                raise parser._mismatch(schema, value, start)
+            return value if convert is None else convert(value)
+        return decode
+
+    def _compile_optional(self, schema):
+        """
+        return the decoder of a value or nil
+        """
+        decode_value = self._compile(schema.schema)
+
+        def decode(parser):
+            if parser._current == 'n' and parser._word_coming():
+                start = parser._index
+                if parser._read_word() == 'nil':
+                    return None
+                parser._reset_index(start)
+            return decode_value(parser)
+        return decode
+
+    def _compile_list(self, schema):
+        """
+        return the decoder of a table with list fields of one schema
+        """
+        decode_item = self._compile(schema[0])
+
+        def decode(parser):
+            parser._begin_table(schema)
+            items = []
+            while not parser._end_of_table():
+                start = parser._index
+                if parser._parse_field_head() is not None:
+                    parser._reset_index(start)
+                    raise TypeError('bad value: expect %s, got a record '
+                                    'field' % _describe(schema))
+                items.append(decode_item(parser))
+                parser._skip_separator()
+            return items
+        return decode
+
+    def _compile_dict(self, schema):
+        """
+        return the decoder of a table with keys and values of one schema each
+        """
+        (key_schema, value_schema), = schema.items()
+        if key_schema is object:
+            key_types = (bool, int, float, str)
+        elif key_schema in _SCALARS:
+            key_types = _SCALARS[key_schema]
+        else:
+            raise TypeError('unsupported key schema %r' % (key_schema,))
+        # a nil value leaves the key out
+        decode_value = self._compile_optional(optional(value_schema))
+
+        def decode(parser):
+            parser._begin_table(schema)
+            table = {}
+            count = 0   # number of list fields
+            while not parser._end_of_table():
+                start = parser._index
+                key = parser._parse_field_head()
+                if key is None:
+                    count += 1
+                    key = count
+                if type(key) not in key_types:
+                    parser._reset_index(start)
+                    raise TypeError('bad key: expect %s, got %s' % (
+                        _describe(key_schema),
+                        _LUA_TYPES.get(type(key), 'table')))
+                value = decode_value(parser)
+                if value is None:   # assigning nil removes the key
+                    table.pop(key, None)
+                else:
+                    table[key] = value
+                parser._skip_separator()
+            return table
+        return decode
+
+    def _compile_record(self, cls):
+        """
+        return the decoder of a table with the named fields of a record class
+        """
+        # fields by name, with their positions and decoders
+        fields = {}
+        initials = []   # None for optional fields, _MISSING for others
+        for index, (name, schema) in enumerate(cls._schema):
+            fields[name] = (index, self._compile(schema))
+            initials.append(None if isinstance(schema, optional) or
+                            schema is object else _MISSING)
+
+        def decode(parser):
+            table_start = parser._index
+            parser._begin_table(cls)
+            values = list(initials)
+            while not parser._end_of_table():
+                start = parser._index
+                name = parser._parse_field_head()
+                if name not in fields:
+                    parser._reset_index(start)
+                    if name is None:
+                        raise TypeError('bad record: %s expects no list '
+                                        'field' % cls.__name__)
+                    raise TypeError('bad record: %s has no field %r' %
+                                    (cls.__name__, name))
+                index, decode_value = fields[name]
+                values[index] = decode_value(parser)
+                parser._skip_separator()
+            if _MISSING in values:
+                parser._reset_index(table_start)
+                raise TypeError('bad record: %s misses field %r' % (
+                    cls.__name__, cls._schema[values.index(_MISSING)][0]))
+            return cls(*values)
+        return decode
@@ -0,0 +1,328 @@
+"""
+    luatable.transcoder
+    ~~~~~~~~~~~~~~~~~~~
+
+    Implements direct Lua table <-> JSON transcoders
+"""
+
+import json
+import json.decoder
+import json.encoder
+import re
+
+from .parser import Parser, RegexParser
+from .generator import Generator, Newlines
+
+class LuaToJSON(RegexParser):
+    """
+    a parser producing JSON texts instead of Python objects, tables are
+    buffered as the JSON texts of their fields until the closing '}' decides
+    between an array and an object
+    """
+
+    def __init__(self, source, indent=None, ensure_ascii=True, encoding=None,
+                 sort_keys=False):
+        Parser.__init__(self, source, encoding=encoding)
+        self._sort_keys = sort_keys
+        self._colon = ':' if indent is None else ': '
+        self._newlines = Newlines(indent)
+        self._level = 0
+        if ensure_ascii:
+            self._encode_string = json.encoder.encode_basestring_ascii
+        else:
+            self._encode_string = json.encoder.encode_basestring
+
+    @staticmethod
+    def _encode_number(number):
+        """
+        return the JSON text of a number
+        """
+        if isinstance(number, int):
+            return int.__repr__(number)
+        elif number != number:
+            return 'NaN'
+        elif number in (float('inf'), float('-inf')):
+            return 'Infinity' if number > 0 else '-Infinity'
+        else:
+            return float.__repr__(number)
+
+    def _encode_key(self, key):
+        """
+        return the JSON text of a key, which is always a string
+        """
+        if isinstance(key, str):
+            return self._encode_string(key)
+        elif isinstance(key, bool):
+            return '"true"' if key else '"false"'
+        else:
+            return '"' + self._encode_number(key) + '"'
+
+    def _parse_expression(self):
+        """
+        parse an expression to its JSON text, or None for nil
+        """
+        if self._table_coming():
+            return self._parse_table()
+        value = Parser._parse_expression(self)
+        if value is None:
+            return None
+        elif isinstance(value, bool):
+            return 'true' if value else 'false'
+        elif isinstance(value, str):
+            return self._encode_string(value)
+        else:
+            return self._encode_number(value)
+
+    def _parse_key(self):
+        """
+        parse the expression of a bracketed key to a Python object
+        """
+        if self._table_coming():
+            raise TypeError("bad table: unsupported key type 'table'")
+        return Parser._parse_expression(self)
+
+    def _parse_table(self):
+        """
+        parse a table to a JSON array or object
+        """
+        self._level += 1
+        text = Parser._parse_table(self)
+        self._level -= 1
+        return text
+
+    def _finalize_table(self, table, count):
+        """
+        join the JSON texts of the fields to an object if any record field
+        occurred, or to an array otherwise
+        """
+        if count['rec'] > 0:    # an object, filter out nil values
+            opening, closing = '{', '}'
+            colon = self._colon
+            items = table.items()
+            if self._sort_keys:
+                items = sorted(items, key=Generator._sort_key)
+            fields = [self._encode_key(key) + colon + value
+                      for key, value in items if value is not None]
+        else:                   # list fields only, an array
+            opening, closing = '[', ']'
+            fields = []
+            for i in range(count['lst']):
+                value = table[i + 1]
+                fields.append('null' if value is None else value)
+
+        if not fields:
+            return opening + closing
+        level = self._level - 1
+        inner = self._newlines[level + 1]
+        return (opening + inner + (',' + inner).join(fields) +
+                self._newlines[level] + closing)
+
+    def transcode(self):
+        """
+        transcode a given Lua representation to JSON
+        """
+        value = self.parse()
+        return 'null' if value is None else value
+
+    def transcode_statement(self):
+        """
+        transcode the expression of a single `return exp` or
+        `[local] Name = exp` statement to JSON
+        """
+        value = self.parse_statement()
+        return 'null' if value is None else value
+
+# what may come next when transcoding JSON to Lua
+_VALUE, _VALUE_OR_CLOSING, _KEY, _KEY_OR_CLOSING, _COMMA = range(5)
+
+class JSONToLua(Generator):
+    """
+    a generator reading JSON tokens instead of Python objects, every token is
+    written out as soon as it is scanned, using a stack of the open
+    containers instead of recursion
+    """
+
+    def __init__(self, source, indent=None, bare_keys=False,
+                 trailing_comma=True):
+        Generator.__init__(self, None, indent, False, bare_keys, trailing_comma)
+        self._source = source
+
+    # an optional comma and a token, one group for each kind of token, so
+    # that a field takes one match only
+    _TOKEN = re.compile(r'''
+        [ \t\n\r]* (,?) [ \t\n\r]*                          # 1 comma
+        (?:
+            "([^"\\\x00-\x1f]*)" (?:[ \t\n\r]* (:))?        # 2 string, 3 key
+          | (")                                             # 4 escaped string
+          | (-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?)  # 5 number
+          | (true|false|null)                               # 6 literal
+          | ([\[{])                                         # 7 opening
+          | ([\]}])                                         # 8 closing
+        )''', re.VERBOSE)
+
+    _COLON = re.compile(r'[ \t\n\r]*:')
+
+    _LITERALS = {'true': 'true', 'false': 'false', 'null': 'nil'}
+
+    _EXPECTINGS = {
+        _VALUE:             'Expecting value',
+        _VALUE_OR_CLOSING:  'Expecting value',
+        _KEY:               'Expecting property name enclosed in double quotes',
+        _KEY_OR_CLOSING:    'Expecting property name enclosed in double quotes',
+        _COMMA:             "Expecting ',' delimiter"
+    }
+
+    def _error(self, message, index):
+        """
+        return an error pointing at the first non-whitespace character
+        """
+        source = self._source
+        while source[index:index + 1] in (' ', '\t', '\n', '\r'):
+            index += 1
+        return json.JSONDecodeError(message, source, index)
+
+    def _generate_key_once(self, key, keys):
+        """
+        return the key of a record field and its '=', cached by key
+        """
+        chunks = []
+        self._generate_key(key, chunks, 0)
+        chunks.append(self._equal)
+        keys[key] = ''.join(chunks)
+        return keys[key]
+
+    def transcode(self):
+        """
+        transcode a given JSON text to Lua
+        """
+        source = self._source
+        token = self._TOKEN.match
+        literals = self._LITERALS
+        generate_string = self._generate_string
+        keys = {}           # cached Lua texts of keys, data files repeat them
+        chunks = []
+        append = chunks.append
+        stack = []          # closing and field separator of open containers
+        expecting = _VALUE
+        index = 0
+
+        while True:
+            match = token(source, index)
+            if match is None:
+                raise self._error(self._EXPECTINGS[expecting], index)
+            kind = match.lastindex
+            index = match.end()
+
+            if match.group(1):                      # a comma
+                if expecting != _COMMA:
+                    raise self._error(self._EXPECTINGS[expecting],
+                                      match.start(1))
+                closing, separator = stack[-1]
+                append(separator)
+                expecting = _VALUE if closing == ']' else _KEY
+            elif expecting == _COMMA:
+                if kind != 8 or match.group(8) != stack[-1][0]:
+                    raise self._error(self._EXPECTINGS[expecting],
+                                      match.start(kind))
+                closing, separator = stack.pop()
+                append(separator)
+                self._close_table(chunks, len(stack))
+                if not stack:
+                    break
+                continue
+
+            if expecting >= _KEY:                   # a key or '}'
+                if kind == 3:
+                    key = match.group(2)
+                elif kind == 4:
+                    key, index = json.decoder.scanstring(source, index)
+                    colon = self._COLON.match(source, index)
+                    if colon is None:
+                        raise self._error("Expecting ':' delimiter", index)
+                    index = colon.end()
+                elif kind == 2:
+                    raise self._error("Expecting ':' delimiter", index)
+                elif kind == 8 and expecting == _KEY_OR_CLOSING and \
+                        match.group(8) == '}':
+                    stack.pop()
+                    chunks[-1] = '{}'
+                    if not stack:
+                        break
+                    expecting = _COMMA
+                    continue
+                else:
+                    raise self._error(self._EXPECTINGS[expecting],
+                                      match.start(kind))
+                append(keys.get(key) or self._generate_key_once(key, keys))
+                expecting = _VALUE
+                continue
+
+            if kind == 2:                           # string
+                append('"' + generate_string(match.group(2)) + '"')
+            elif kind == 5:                         # number, same in Lua
+                append(match.group(5))
+            elif kind == 6:                         # true, false, null
+                append(literals[match.group(6)])
+            elif kind == 7:                         # object or array
+                if match.group(7) == '{':
+                    stack.append(('}', self._open_table(chunks, len(stack))))
+                    expecting = _KEY_OR_CLOSING
+                else:
+                    stack.append((']', self._open_table(chunks, len(stack))))
+                    expecting = _VALUE_OR_CLOSING
+                continue
+            elif kind == 4:
+                string, index = json.decoder.scanstring(source, index)
+                append('"' + generate_string(string) + '"')
+            elif kind == 8 and expecting == _VALUE_OR_CLOSING and \
+                    match.group(8) == ']':
+                stack.pop()
+                chunks[-1] = '{}'
+            elif kind == 3:                         # a key in an array
+                raise self._error(self._EXPECTINGS[_COMMA], match.start(3))
+            else:
+                raise self._error(self._EXPECTINGS[expecting],
+                                  match.start(kind))
+
+            # a value is complete
+            if not stack:
+                break
+            expecting = _COMMA
+
+        if source[index:].strip(' \t\n\r'):
+            raise self._error('Extra data', index)
+        return ''.join(chunks)
+
+def luatojson(src, indent=None, ensure_ascii=True, encoding=None,
+              statement=False, sort_keys=False):
+    """
+    return the JSON representation of the given Lua representation, without
+    building the intermediate Python objects
+
+    indent: a string or a number of spaces to indent nested values with,
+            None for the compact single-line style
+    ensure_ascii: escape all non-ASCII characters in strings
+    encoding: the encoding of a bytes source without a BOM, UTF-8 by default
+    statement: accept a `return exp` or `[local] Name = exp` statement and
+               transcode the value of its expression
+    sort_keys: emit object members ordered by key, numbers before strings
+               as with tolua
+    """
+    if not isinstance(src, (str, bytes, bytearray)):
+        raise TypeError('require a string or bytes to transcode')
+    transcoder = LuaToJSON(src, indent, ensure_ascii, encoding, sort_keys)
+    if statement:
+        return transcoder.transcode_statement()
+    return transcoder.transcode()
+
+def jsontolua(src, indent=None, bare_keys=False, trailing_comma=True):
+    """
+    return the Lua representation of the given JSON text, without building
+    the intermediate Python objects
+
+    indent, bare_keys, trailing_comma: the same as those of tolua
+    """
+    if not isinstance(src, str):
+        raise TypeError('require a string to transcode')
+    transcoder = JSONToLua(src, indent, bare_keys, trailing_comma)
+    return transcoder.transcode()
@@ -0,0 +1,378 @@
+"""
+    luatable.validator
+    ~~~~~~~~~~~~~~~~~~
+
+    Implements a Lua table syntax checker
+"""
+
+import re
+
+from .parser import Parser, RegexParser
+
+# valid escape sequences, \z and newlines other than \n are left out
+_ESCAPE = (r'\\(?:[abfnrtv\\"\'\n]|x[0-9a-fA-F]{2}|'
+           r'25[0-5]|2[0-4][0-9]|[01][0-9][0-9]|[0-9][0-9]?(?![0-9]))')
+
+_STRING = r'"(?:[^"\\\n\r]|%s)*"|\'(?:[^\'\\\n\r]|%s)*\'' % (_ESCAPE, _ESCAPE)
+
+_NUMBER = (r'0[xX](?:[0-9a-fA-F]+(?:\.[0-9a-fA-F]*)?|\.[0-9a-fA-F]+)'
+           r'(?:[pP][+-]?[0-9a-fA-F]+)?'
+           r'|(?:[0-9]+(?:\.[0-9]*)?|\.[0-9]+)(?:[eE][+-]?[0-9]+)?')
+
+_SIGNED_NUMBER = r'(?:-[ \t\n\r]*)?(?:%s)(?![\w.])' % _NUMBER
+
+_NAME = r'(?!(?:%s)\b)[A-Za-z_][A-Za-z0-9_]*' % '|'.join(Parser._KWORDS)
+
+def _long_pattern(name):
+    """
+    return the pattern of a long string, its level goes to the given group;
+    it never runs past the first closing bracket of the same level
+    """
+    return (r'\[(?P<%s>=*)\[[^\]]*(?:\](?!(?P=%s)\])[^\]]*)*\](?P=%s)\]' %
+            (name, name, name))
+
+def _skip_pattern(name):
+    """
+    return the pattern of spaces and comments, the level of long comments
+    goes to the given group; a short comment always runs to the end of its
+    line, never backtracking to leave commented-out text to the tokens
+    """
+    return (r'\s*(?:--(?:%s|(?!\[=*\[)[^\n\r]*(?=[\n\r]|\Z))\s*)*' %
+            _long_pattern(name))
+
+def _key_pattern(name):
+    """
+    return the pattern of a bracketed key and its '='
+    """
+    return (r'\[(?![=\[])\s*(?:%s|%s|%s|(?:true|false)(?!\w))\s*\]\s*=' %
+            (_STRING, _long_pattern(name), _SIGNED_NUMBER))
+
+def _scalar_pattern(name):
+    """
+    return the pattern of a string, number, nil, true or false
+    """
+    return r'%s|%s|%s|(?:nil|true|false)(?!\w)' % (
+        _STRING, _long_pattern(name), _SIGNED_NUMBER)
+
+# spaces and comments followed by a token; a field with a scalar value and its
+# separator, or the opening of a table with its key, count as one token, and
+# comments are only covered between tokens
+_TOKEN = re.compile(r"""%(skip)s
+    (?:
+        (?P<field>
+            (?P<fieldkey>(?:%(name)s)\s*=(?!=)|%(key1)s)?\s*
+            (?P<fieldvalue>%(scalar)s)\s*(?P<fieldsep>[,;]))
+      | (?P<open>(?P<openkey>(?:%(name)s)\s*=(?!=)|%(key2)s)?\s*\{)
+      | (?P<close>\}(?:\s*(?P<closesep>[,;]))?)
+      | (?P<string>%(string)s)
+      | (?P<long>%(long)s)
+      | (?P<number>%(number)s)
+      | (?P<word>[A-Za-z_][A-Za-z0-9_]*)(?!\w)
+      | (?P<punct>\[(?![=\[])|[\]=,;])
+      | (?P<end>\Z)
+    )""" % {'skip': _skip_pattern('c'), 'name': _NAME,
+            'key1': _key_pattern('k1'), 'key2': _key_pattern('k2'),
+            'scalar': _scalar_pattern('s'), 'string': _STRING,
+            'long': _long_pattern('l'), 'number': _SIGNED_NUMBER},
+    re.VERBOSE | re.DOTALL)
+
+# the head of a `return exp` or `[local] Name = exp` statement
+_HEAD = re.compile(r'%s(?:(?P<return>return)(?!\w)|(?:local(?!\w)%s)?'
+                   r'(?P<name>%s)\s*=(?!=))' % (_skip_pattern('c1'),
+                                                _skip_pattern('c2'), _NAME),
+                   re.DOTALL)
+
+# what may come next when scanning an expression
+_EXPRESSION, _FIELD, _KEY, _SEPARATOR = range(4)
+
+class Validator(RegexParser):
+    """
+    a parser checking the syntax only, a whole source is first scanned with
+    one regular expression match per token; anything the scanner does not
+    cover goes the way of the parser, where spaces, comments, strings,
+    numbers and words are still skipped with regular expressions, and no
+    value is built either way
+    """
+
+    _STRINGS = {
+        '"': re.compile(r'"(?:[^"\\\n\r]|%s)*"' % _ESCAPE),
+        "'": re.compile(r"'(?:[^'\\\n\r]|%s)*'" % _ESCAPE)
+    }
+
+    def _parse_string(self):
+        """
+        skip a literal short string
+        """
+        assert self._string_coming()
+        match = self._STRINGS[self._current].match(self._source, self._index)
+        if match is None:       # let the parser find out
+            Parser._parse_string(self)
+        else:
+            self._jump(match.end())
+        return ''
+
+    def _parse_long_string(self):
+        """
+        skip a literal long string
+        """
+        assert self._long_string_coming()
+        source = self._source
+        match = self._LONG_BRACKET.match(source, self._index)
+        end = -1
+        if match is not None:
+            closing = ']' + match.group(1) + ']'
+            end = source.find(closing, match.end())
+        if end < 0:             # let the parser find out
+            Parser._parse_long_string(self)
+        else:
+            self._jump(end + len(closing))
+        return ''
+
+    # numbers as far as the parser reads them, however malformed, with their
+    # fraction or exponent groups None if missing
+    _NUMBERS = re.compile(
+        r'0[xX](?P<hex>[0-9a-fA-F]*)(?:\.(?P<hexfrac>[0-9a-fA-F]*))?'
+        r'(?:[pP][+-]?(?P<hexexp>[0-9a-fA-F]*))?'
+        r'|(?P<int>[0-9]*)(?:\.(?P<frac>[0-9]*))?'
+        r'(?:[eE][+-]?(?P<exp>[0-9]*))?')
+
+    def _parse_number(self):
+        """
+        skip a number, computing nothing
+        """
+        assert self._number_coming()
+        match = self._NUMBERS.match(self._source, self._index)
+        self._jump(match.end())
+        if match.group('hex') is not None:
+            integer, fraction, exponent = match.group('hex', 'hexfrac',
+                                                      'hexexp')
+        else:
+            integer, fraction, exponent = match.group('int', 'frac', 'exp')
+        if exponent == '':
+            raise SyntaxError('bad number: empty exponent part')
+        if not integer and not fraction:
+            raise SyntaxError('bad number: empty integer and fraction part')
+        return 0
+
+    def _parse_field(self, table, count):
+        """
+        parse a record-style field or a list-style field, keep nothing
+        """
+        record_style1 = self._current == '[' and not self._long_string_coming()
+        record_style2 = self._word_coming() and self._equal_behind_word()
+        if record_style1 or record_style2:
+            key, value = self._parse_record_field()
+            # only support number or string as key
+            if not isinstance(key, (int, float, str)):
+                raise TypeError("bad table: unsupported key type '%s'" %
+                                type(key))
+        else:
+            self._parse_expression()
+
+    def _finalize_table(self, table, count):
+        """
+        build nothing, an empty tuple stands for the table, which is neither
+        nil nor a valid key
+        """
+        return ()
+
+    _LITERALS = {'nil', 'true', 'false'}
+
+    def _scan_expression(self, match):
+        """
+        scan the expression starting with the given token in a loop, return
+        the index after it, or -1 if anything is not covered
+        """
+        source = self._source
+        token = _TOKEN.match
+        depth = 0
+        state = _EXPRESSION
+
+        while match is not None:
+            kind = match.lastgroup
+            if kind == 'field':                     # [key =] scalar ,
+                if state == _FIELD:
+                    match = token(source, match.end())
+                    continue
+                elif state != _EXPRESSION or match.group('fieldkey'):
+                    return -1
+                elif depth == 0:                    # the separator is not ours
+                    return match.start('fieldsep')
+                state = _FIELD
+                match = token(source, match.end())
+                continue
+            elif kind == 'open':                    # [key =] {
+                if state != _FIELD and (state != _EXPRESSION or
+                                        match.group('openkey')):
+                    return -1
+                depth += 1
+                state = _FIELD
+                match = token(source, match.end())
+                continue
+            elif kind == 'close':                   # } [,]
+                if state != _FIELD and state != _SEPARATOR:
+                    return -1
+                depth -= 1
+                separator = match.group('closesep')
+                if depth == 0:
+                    return match.start('closesep') if separator else \
+                        match.end()
+                state = _FIELD if separator else _SEPARATOR
+                match = token(source, match.end())
+                continue
+
+            if state == _EXPRESSION:
+                if kind == 'word':
+                    if match.group('word') not in self._LITERALS:
+                        return -1
+                elif kind not in ('string', 'long', 'number'):
+                    return -1
+            elif state == _FIELD:
+                if match.group('punct') == '[':
+                    state = _KEY
+                    match = token(source, match.end())
+                    continue
+                elif kind == 'word':
+                    following = token(source, match.end())
+                    if following is None:
+                        return -1
+                    word = match.group('word')
+                    if following.group('punct') == '=':   # Name = exp
+                        if word in self._KWORDS:
+                            return -1
+                        state = _EXPRESSION
+                        match = token(source, following.end())
+                    elif word in self._LITERALS:            # nil, true, false
+                        state = _SEPARATOR
+                        match = following
+                    else:
+                        return -1
+                    continue
+                state = _EXPRESSION
+                continue
+            elif state == _KEY:
+                if kind == 'word':
+                    if match.group('word') not in ('true', 'false'):
+                        return -1
+                elif kind not in ('string', 'long', 'number'):
+                    return -1
+                following = token(source, match.end())
+                if following is None or following.group('punct') != ']':
+                    return -1
+                following = token(source, following.end())
+                if following is None or following.group('punct') != '=':
+                    return -1
+                state = _EXPRESSION
+                match = token(source, following.end())
+                continue
+            else:   # _SEPARATOR
+                if match.group('punct') not in (',', ';'):
+                    return -1
+                state = _FIELD
+                match = token(source, match.end())
+                continue
+
+            # an expression is complete
+            if depth == 0:
+                return match.end()
+            state = _SEPARATOR
+            match = token(source, match.end())
+        return -1
+
+    def _scan(self, statement=False, chunk=False):
+        """
+        scan a given Lua representation with one regular expression match per
+        token, return True if it is good, or False if anything is not covered
+        so that the parser has to find out
+        """
+        source = self._source
+        token = _TOKEN.match
+        names = set()   # names assigned so far in a chunk
+        index = self._index
+
+        while True:
+            head = None
+            if statement or chunk:
+                match = _HEAD.match(source, index)
+                if match is not None:
+                    head = match.group('name') or 'return'
+                    index = match.end()
+
+            match = token(source, index)
+            if match is None:
+                return False
+            if chunk and head is None:
+                return match.lastgroup == 'end'
+
+            value = match.group('word')
+            if chunk and head == 'return' and (match.lastgroup == 'end' or
+                                               match.group('punct') == ';'):
+                index = match.start(match.lastgroup)
+            elif chunk and head == 'return' and value is not None and \
+                    value not in self._KWORDS:
+                if value not in names:
+                    return False
+                index = match.end()
+            else:
+                value = value or match.group('fieldvalue')
+                index = self._scan_expression(match)
+                if index < 0:
+                    return False
+
+            match = token(source, index)
+            if match is not None and (statement or chunk) and \
+                    match.group('punct') == ';':
+                index = match.end()
+                match = token(source, index)
+            if match is None:
+                return False
+            if not chunk or head == 'return':
+                return match.lastgroup == 'end'
+            if value == 'nil':  # assigning nil removes the name
+                names.discard(head)
+            else:
+                names.add(head)
+
+    def validate(self, statement=False, chunk=False):
+        """
+        check the syntax of a given Lua representation
+        """
+        if self._scan(statement, chunk):
+            return
+        try:
+            if chunk:
+                self.parse_chunk()
+            elif statement:
+                self.parse_statement()
+            else:
+                self.parse()
+        except TypeError as error:  # an unsupported key, bad syntax here
+            raise self._locate(SyntaxError(str(error)))
+
+def validate(src, encoding=None, statement=False, chunk=False):
+    """
+    check the syntax of the given Lua representation without building any
+    value, raise a SyntaxError carrying lineno, offset and text if it is bad
+
+    encoding, statement, chunk: the same as those of fromlua
+    """
+    if not isinstance(src, (str, bytes, bytearray)):
+        raise TypeError('require a string or bytes to validate')
+    validator = Validator(src, encoding=encoding)
+    validator.validate(statement, chunk)
+
+def check_file(path, encoding=None, statement=False, chunk=False):
+    """
+    check the syntax of a Lua file, return None if it is good, or a
+    SyntaxError carrying filename, lineno, offset and text if it is bad
+
+    encoding, statement, chunk: the same as those of fromlua
+    """
+    with open(path, 'rb') as fp:
+        source = fp.read()
+    try:
+        validate(source, encoding, statement, chunk)
+    except SyntaxError as error:
+        error.filename = path
+        return error
+    return None
@@ -1,13 +1,8 @@
 #_*_coding:utf-8_*_
 
+import io
 import os
-import re
-import json
-from luatable import fromlua
-
-import sys
-reload(sys)
-sys.setdefaultencoding('utf8')
+from luatable import luatojson
 
 def convert(root, filename, out_dir):
     name, ext = os.path.splitext(filename)
@@ -15,25 +10,22 @@ def convert(root, filename, out_dir):
         return
 
     lua_file = os.path.join(root, filename)
-    with open(lua_file, "r") as fp:
+    with open(lua_file, "rb") as fp:
         content = fp.read()
 
-    # remove Table =
-    content = re.sub("Table\s*=\s*.*{", "{", content, re.I|re.M|re.S)
-
     try:
-        # there are ??? chars, fix me!!!
-        json_datas = fromlua(content[3:])
-    except Exception, e:
-        print e
+        # BOM and "Table = " are taken care of by the transcoder
+        json_str = luatojson(content, indent=4, ensure_ascii=False,
+                             statement=True, sort_keys=True)
+    except Exception as e:
+        print(e)
         return
 
-    json_str = json.dumps(json_datas, sort_keys=True, indent=4)
     json_file = os.path.join(out_dir, name + ".json")
-    with open(json_file, "w") as fp:
-        fp.write(json_str.decode("unicode-escape"))
+    with io.open(json_file, "w", encoding="utf-8") as fp:
+        fp.write(json_str)
 
-    print "convert file [%s]    OK" % filename
+    print("convert file [%s]    OK" % filename)
 
 
 if __name__ == "__main__":
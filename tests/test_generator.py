@@ -5,6 +5,10 @@
     Lua table generator (encoder)
 """
 
+import array
+import ctypes
+import enum
+import os
 import unittest
 
 from luatable.generator import Generator
@@ -26,3 +30,116 @@ class GeneratorTestCase(unittest.TestCase):
         generated1 = Generator(input1).generate()
         output1 = Parser(generated1).parse()
         self.assertEqual(input1, output1)
+
+    def test_generate_compact(self):
+        input1 = ['foo', {'bar': ['baz', None, 1.0, 2]}]
+        output1 = '{"foo",{["bar"]={"baz",nil,1.0,2,},},}'
+        self.assertEqual(Generator(input1).generate(), output1)
+
+        output2 = '{"foo",{["bar"]={"baz",nil,1.0,2}}}'
+        generated2 = Generator(input1, trailing_comma=False).generate()
+        self.assertEqual(generated2, output2)
+
+        input3 = {'name': 1, 'end': 2, '2x': 3, 'a b': 4}
+        output3 = '{name=1,["end"]=2,["2x"]=3,["a b"]=4,}'
+        self.assertEqual(Generator(input3, bare_keys=True).generate(), output3)
+
+    def test_generate_string(self):
+        inputs = ['alo\n123"', "it's \\ \x01\x7f\t", 'caf\xe9',
+                  '\u4e2d\u6587', '\U0001f600 \u2028']
+        outputs = ['"alo\\n123\\""', '"it\\\'s \\\\ \\x01\\x7f\\t"',
+                   '"caf\xe9"', '"\u4e2d\u6587"', '"\U0001f600 \u2028"']
+        for i_val, o_val in zip(inputs, outputs):
+            generated = Generator(i_val).generate()
+            self.assertEqual(generated, o_val)
+            self.assertEqual(Parser(generated).parse(), i_val)
+
+    def test_generate_pretty(self):
+        input1 = {'list': [1, 'two', []], 'color': 'blue', 3: True}
+        output1 = '\n'.join([
+            '{',
+            '  [3] = true,',
+            '  color = "blue",',
+            '  list = {',
+            '    1,',
+            '    "two",',
+            '    {}',
+            '  }',
+            '}'
+        ])
+        generated1 = Generator(input1, indent=2, sort_keys=True,
+                               bare_keys=True, trailing_comma=False).generate()
+        self.assertEqual(generated1, output1)
+        self.assertEqual(Parser(generated1).parse(), input1)
+
+    def test_generate_array_part(self):
+        input1 = {1: 'red', 2: 'green', 3: 'blue'}
+        output1 = '{"red","green","blue",}'
+        self.assertEqual(Generator(input1).generate(), output1)
+
+        input2 = {1: 'one', 2: 'two', 'x': 10, 5: 'five'}
+        output2 = '{"one","two",["x"]=10,[5]="five",}'
+        self.assertEqual(Generator(input2).generate(), output2)
+        self.assertEqual(Parser(output2).parse(), input2)
+
+        input3 = {1: 'one', 2: None, 3: 'three'}
+        output3 = '{"one",[2]=nil,[3]="three",}'
+        self.assertEqual(Generator(input3).generate(), output3)
+        self.assertEqual(Parser(output3).parse(), {1: 'one', 3: 'three'})
+        generated4 = Generator({1: 'a', 2: None}).generate()
+        self.assertEqual(Parser(generated4).parse(), ['a'])
+
+        # a mapping refusing int keys
+        environ = dict(os.environ)
+        self.assertEqual(Generator(os.environ, sort_keys=True).generate(),
+                         Generator(environ, sort_keys=True).generate())
+
+    def test_generate_sequence(self):
+        inputs = [(1, 'two'), range(1, 3), (x for x in (1, 2)),
+                  array.array('i', [1, 2]), array.array('d', [1.5, -2.0]),
+                  memoryview(array.array('b', [1, 2]))]
+        outputs = ['{1,"two",}', '{1,2,}', '{1,2,}',
+                   '{1,2,}', '{1.5,-2.0,}', '{1,2,}']
+        for i_val, o_val in zip(inputs, outputs):
+            self.assertEqual(Generator(i_val).generate(), o_val)
+
+        self.assertEqual(Generator(array.array('i')).generate(), '{}')
+        # ctypes arrays have byte order prefixes and multi-character formats
+        doubles = (ctypes.c_double * 2)(1.5, -2.0)
+        self.assertEqual(Generator(doubles).generate(), '{1.5,-2.0,}')
+        numbers = ctypes.c_int(7), ctypes.c_int(8)
+        pointers = (ctypes.POINTER(ctypes.c_int) * 2)(*map(ctypes.pointer,
+                                                            numbers))
+        self.assertEqual(memoryview(pointers).format[-1:], 'i')
+        self.assertRaises(TypeError, Generator(pointers).generate)
+        generated = Generator(pointers,
+                              default=lambda p: p.contents.value).generate()
+        self.assertEqual(generated, '{7,8,}')
+        matrix = (ctypes.c_short * 2 * 2)((1, 2), (3, 4))
+        self.assertEqual(Generator(matrix).generate(), '{{1,2,},{3,4,},}')
+        self.assertEqual(Generator(iter([])).generate(), '{}')
+        self.assertRaises(TypeError, Generator(b'bytes').generate)
+        self.assertRaises(TypeError, Generator(object()).generate)
+
+    def test_generate_default(self):
+        class Point:
+            def __init__(self, x, y):
+                self.x, self.y = x, y
+
+        input1 = [Point(0, 1), Point(2, 3)]
+        output1 = '{{["x"]=0,["y"]=1,},{["x"]=2,["y"]=3,},}'
+        generated1 = Generator(input1, default=vars).generate()
+        self.assertEqual(generated1, output1)
+        self.assertRaises(TypeError, Generator(input1).generate)
+        generated2 = Generator([b'x'], default=bytes.decode).generate()
+        self.assertEqual(generated2, '{"x",}')
+
+        class Color(enum.IntEnum):
+            RED = 1
+
+        class Ratio(float):
+            def __str__(self):
+                return 'Ratio'
+
+        generated3 = Generator({Color.RED: Ratio(0.5)}).generate()
+        self.assertEqual(generated3, '{0.5,}')
@@ -49,3 +49,22 @@ class ModuleTestCase(unittest.TestCase):
 
         self.assertEqual(fromlua(input1), output1)
         self.assertEqual(fromlua(tolua(fromlua(input1))), output1)
+
+    def test_hooks(self):
+        class Point:
+            def __init__(self, x, y):
+                self.x, self.y = x, y
+
+        input1 = '{{x=0, y=1}, {x=2, y=3}}'
+        points = fromlua(input1, object_hook=lambda d: Point(**d),
+                         array_hook=tuple)
+        self.assertIsInstance(points, tuple)
+        self.assertEqual([(p.x, p.y) for p in points], [(0, 1), (2, 3)])
+        self.assertEqual(fromlua(tolua(points, default=vars)),
+                         [{'x': 0, 'y': 1}, {'x': 2, 'y': 3}])
+
+    def test_fromlua_bytes_statement(self):
+        input1 = b'\xef\xbb\xbfTable = {name = "\xc3\xa9p\xc3\xa9e"}\n'
+        output1 = {'name': 'épée'}
+        self.assertEqual(fromlua(input1, statement=True), output1)
+        self.assertRaises(SyntaxError, fromlua, input1)
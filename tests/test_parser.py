@@ -129,3 +129,74 @@ class ParserTestCase(unittest.TestCase):
             'color': "blue"
         }
         self.assertEqual(Parser(input1).parse(), output1)
+
+    def test_parse_hooks(self):
+        input1 = '{{x=1, y=2}, {3, 4}, {}}'
+        output1 = ('list', [('dict', {'x': 1, 'y': 2}),
+                            ('list', [3, 4]), ('list', [])])
+        parser1 = Parser(input1, object_hook=lambda d: ('dict', d),
+                         array_hook=lambda l: ('list', l))
+        self.assertEqual(parser1.parse(), output1)
+
+    def test_parse_bytes(self):
+        input1 = '{"épée", 1}'
+        output1 = ['épée', 1]
+        encodings = ['utf-8', 'utf-8-sig', 'utf-16', 'utf-32']
+        for encoding in encodings:
+            self.assertEqual(Parser(input1.encode(encoding)).parse(), output1)
+        self.assertEqual(Parser(input1.encode('latin-1'),
+                                encoding='latin-1').parse(), output1)
+        self.assertEqual(Parser('\ufeff' + input1).parse(), output1)
+
+    def test_parse_statement(self):
+        inputs = ['Table = {1, 2}', 'local Table={1, 2};', 'return {1, 2}',
+                  '-- comment\nTable --[[ comment ]] = {1, 2} -- comment',
+                  '{1, 2}']
+        output = [1, 2]
+        for i_val in inputs:
+            self.assertEqual(Parser(i_val).parse_statement(), output)
+        self.assertEqual(Parser('true').parse_statement(), True)
+
+        inputs = ['Table == {}', 'local = {}', 'local end = {}', 'end = {}',
+                  'Table = {} {}', 'return']
+        for i_val in inputs:
+            self.assertRaises(SyntaxError, Parser(i_val).parse_statement)
+
+    def test_parse_chunk(self):
+        input1 = """
+            -- generated, do not edit
+            local Items = {{id=1}, {id=2}};
+            Names = {"x = 1", [[return y]]}  --[[ Junk = {} ]]
+            Removed = nil
+            return Items
+        """
+        output1 = {'Items': [{'id': 1}, {'id': 2}],
+                   'Names': ['x = 1', 'return y'],
+                   'return': [{'id': 1}, {'id': 2}]}
+        self.assertEqual(Parser(input1).parse_chunk(), output1)
+
+        input2 = 'A = 1 B = 2; return {3}'
+        output2 = {'A': 1, 'B': 2, 'return': [3]}
+        self.assertEqual(Parser(input2).parse_chunk(), output2)
+
+        inputs = ['{1}', 'A = 1 return B', 'return 1 A = 2', 'A = 1 B']
+        for i_val in inputs:
+            self.assertRaises(SyntaxError, Parser(i_val).parse_chunk)
+
+    def test_parse_error_position(self):
+        inputs = [
+            ('{\n  x = 1,\n  y = 2 3\n}', 'parse', (19, 3, 9, '  y = 2 3')),
+            ('{\r\n  x = 1,\r\n\r\n  y = }', 'parse', (21, 4, 7, '  y = }')),
+            ('{1,', 'parse', (3, 1, 4, '{1,')),
+            ('local T = {1}; {}', 'parse_statement', (15, 1, 16, None)),
+            ('A = 1\nreturn B', 'parse_chunk', (13, 2, 8, 'return B'))
+        ]
+        for i_val, method, (pos, lineno, colno, text) in inputs:
+            with self.assertRaises(SyntaxError) as context:
+                getattr(Parser(i_val), method)()
+            error = context.exception
+            self.assertEqual(error.pos, pos)
+            self.assertEqual(error.lineno, lineno)
+            self.assertEqual(error.colno, colno)
+            self.assertEqual(error.offset, colno)
+            self.assertEqual(error.text, text or i_val)
@@ -0,0 +1,106 @@
+"""
+    tests.test_schema
+    ~~~~~~~~~~~~~~~~~
+
+    Schema-driven typed decoders
+"""
+
+import unittest
+
+from luatable.parser import Parser
+from luatable.schema import Schema, record, optional
+
+Point = record('Point', [('x', int), ('y', int)], named_tuple=True)
+
+Item = record('Item', [
+    ('id', int), ('name', str), ('price', optional(float)), ('tags', [str]),
+    ('stats', {str: int}), ('extra', object), ('at', optional(Point))
+])
+
+class SchemaTestCase(unittest.TestCase):
+
+    def test_decode_scalars(self):
+        inputs = [
+            (int, '-0x10', -16), (int, '007', 7), (float, '2', 2.0),
+            (float, '.5e1', 5.0), (str, '"\\x61lo"', 'alo'), (str, "'a'", 'a'),
+            (str, '[==[\nalo]==]', 'alo'), (bool, 'false', False),
+            (object, '{1, {x=nil}}', [1, []]), (object, 'nil', None),
+            (optional(int), 'nil', None), (optional(int), '1', 1)
+        ]
+        for schema, i_val, output in inputs:
+            self.assertEqual(Schema(schema).decode(i_val), output)
+            self.assertEqual(type(Schema(schema).decode(i_val)), type(output))
+
+        inputs = [(int, '1.5'), (int, 'true'), (int, '"1"'), (str, 'nil'),
+                  (bool, '0'), (float, '{}'), (optional(str), 'never')]
+        for schema, i_val in inputs:
+            self.assertRaises((TypeError, SyntaxError),
+                              Schema(schema).decode, i_val)
+
+    def test_decode_tables(self):
+        self.assertEqual(Schema([int]).decode('{1, 2; 3,}'), [1, 2, 3])
+        self.assertEqual(Schema([[str]]).decode('{{}, {"a"}}'), [[], ['a']])
+        self.assertEqual(Schema([optional(int)]).decode('{1, nil}'),
+                         [1, None])
+        self.assertEqual(Schema({str: int}).decode('{a=1, ["b"]=2, c=nil}'),
+                         {'a': 1, 'b': 2})
+        self.assertEqual(Schema({object: str}).decode('{"x", [3]="z"}'),
+                         {1: 'x', 3: 'z'})
+        self.assertEqual(Schema({str: Point}).decode('{p = {y=2, x=1}}'),
+                         {'p': Point(1, 2)})
+
+        inputs = [([int], '{1, x=2}'), ([int], '{1, nil}'), ([int], '1'),
+                  ({str: int}, '{1}'), ({str: int}, '{a="1"}'),
+                  ([int], '{1 2}'), ([int], '{1,'), ({str: int}, '{[{}]=1}')]
+        for schema, i_val in inputs:
+            self.assertRaises((TypeError, SyntaxError),
+                              Schema(schema).decode, i_val)
+
+    def test_decode_records(self):
+        input1 = """
+            Items = {
+                {id = 1, name = "sword", tags = {"melee"}, stats = {atk = 3},
+                 extra = {1, 2}, at = {x = 0, y = 1}},  -- placed
+                {name = 'shield', id = 2, price = 10, tags = {}, stats = {},
+                 extra = nil},
+            }
+        """
+        items = Schema([Item]).decode(input1, statement=True)
+        self.assertEqual(items, [
+            Item(1, 'sword', None, ['melee'], {'atk': 3}, [1, 2], Point(0, 1)),
+            Item(2, 'shield', 10.0, [], {}, None, None)
+        ])
+        self.assertEqual(items[1].price, 10.0)
+        self.assertFalse(hasattr(items[0], '__dict__'))
+        self.assertEqual(list(items[0]._asdict()), list(Item._fields))
+        self.assertEqual(repr(items[1])[:27], "Item(id=2, name='shield', p")
+
+        raw = Parser(input1).parse_statement()
+        self.assertEqual([item.name for item in items],
+                         [table['name'] for table in raw])
+
+        inputs = ['{id=1}', '{{id=1, name="a", tags={}, stats={}, bad=1}}',
+                  '{{id=1, name="a", tags={}, stats={}, 1}}',
+                  '{{id="1", name="a", tags={}, stats={}}}', '{{nil=1}}']
+        for i_val in inputs:
+            self.assertRaises((TypeError, SyntaxError),
+                              Schema([Item]).decode, i_val)
+        self.assertRaises(TypeError, Schema, {str: [int, str]})
+        self.assertRaises(TypeError, Schema, {(int,): int})
+
+    def test_decode_error_position(self):
+        schema = Schema([Point])
+        with self.assertRaises(TypeError) as context:
+            schema.decode('{\n  {x=1, y=2},\n  {x=1, y="2"},\n}')
+        error = context.exception
+        self.assertEqual((error.lineno, error.colno), (3, 11))
+        self.assertIn('expect int, got string (line 3)', str(error))
+
+        with self.assertRaises(TypeError) as context:
+            schema.decode('{{x=1, y=2}, {x=1}}')
+        self.assertEqual(context.exception.colno, 14)
+        self.assertIn("misses field 'y'", str(context.exception))
+
+        with self.assertRaises(SyntaxError) as context:
+            schema.decode('{{x=1, y=2}\n {x=1}}')
+        self.assertEqual(context.exception.lineno, 2)
@@ -0,0 +1,73 @@
+"""
+    tests.test_transcoder
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Lua table <-> JSON transcoders
+"""
+
+import json
+import unittest
+
+from luatable.generator import Generator
+from luatable.parser import Parser
+from luatable.transcoder import LuaToJSON, JSONToLua
+
+class TranscoderTestCase(unittest.TestCase):
+
+    def test_lua_to_json(self):
+        # examples from Lua 5.2 Reference Manual and Programming in Lua, 3e
+        inputs = [
+            '{ ["f(1)"] = "g"; "x", "y"; x = 1, "f(x)", [30] = 23; 45 }',
+            '{"Sunday", "Monday", nil, "Wednesday"}',
+            '{x=0, y=0, label="console", z=nil}',
+            '{[20] = "-", [2.5] = "--", [true] = "---"}',
+            '{x=10, y=45; "one", nil, "three", {}, {n=nil}}',
+            '{list = {3141.6e-3, 0xA23p-4}, "\\x61\\n\\xe9"}',
+            '-.5', '"alo"', 'nil', 'true'
+        ]
+        for i_val in inputs:
+            expected = json.dumps(Parser(i_val).parse(), separators=(',', ':'))
+            self.assertEqual(LuaToJSON(i_val).transcode(), expected)
+            expected = json.dumps(Parser(i_val).parse(), indent=2,
+                                  ensure_ascii=False)
+            transcoded = LuaToJSON(i_val, indent=2,
+                                   ensure_ascii=False).transcode()
+            self.assertEqual(transcoded, expected)
+
+        input2 = '{b = {z = 1, y = 2}, a = 3, [10] = 4, [2] = 5, "x"}'
+        expected = '{"1":"x","2":5,"10":4,"a":3,"b":{"y":2,"z":1}}'
+        self.assertEqual(LuaToJSON(input2, sort_keys=True).transcode(),
+                         expected)
+        expected = json.dumps(json.loads(expected), indent=4)
+        transcoded = LuaToJSON(input2, indent=4, sort_keys=True).transcode()
+        self.assertEqual(transcoded, expected)
+
+        input1 = 'local Table = {1, 2};'
+        self.assertEqual(LuaToJSON(input1).transcode_statement(), '[1,2]')
+        self.assertRaises(TypeError, LuaToJSON('{[{}] = 1}').transcode)
+        self.assertRaises(SyntaxError, LuaToJSON('{1 2}').transcode)
+
+    def test_json_to_lua(self):
+        inputs = [
+            '{"f(1)": "g", "1": "x", "list": [1, -2.5, true, null, []]}',
+            ' [{"a b": {}, "end": "\\u00e9\\n", "x": [[], {"y": 0}]}] ',
+            '"alo"', '3', 'null', '[]', '{}'
+        ]
+        for i_val in inputs:
+            obj = json.loads(i_val)
+            for options in ({}, {'indent': 2, 'bare_keys': True,
+                                 'trailing_comma': False}):
+                expected = Generator(obj, **options).generate()
+                transcoded = JSONToLua(i_val, **options).transcode()
+                self.assertEqual(transcoded, expected)
+
+        self.assertEqual(JSONToLua('[1.5e3]').transcode(), '{1.5e3,}')
+        input1 = '["\\u4e2d\\u00e9", "\\ud83d\\ude00"]'
+        transcoded = JSONToLua(input1).transcode()
+        self.assertEqual(transcoded, '{"中é","\U0001f600",}')
+        self.assertEqual(Parser(transcoded).parse(),
+                         ['中é', '\U0001f600'])
+        inputs = ['', '[1,]', '{"a": 1,}', '{"a" 1}', '["a": 1]', '[1 2]',
+                  '{1: 2}', '[1] 2', '[1}', '{"a": 1]', 'NaN', '[']
+        for i_val in inputs:
+            self.assertRaises(ValueError, JSONToLua(i_val).transcode)
@@ -0,0 +1,87 @@
+"""
+    tests.test_validator
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Lua table syntax checker
+"""
+
+import os
+import tempfile
+import unittest
+
+from luatable.parser import Parser
+from luatable.validator import Validator, validate, check_file
+
+class ValidatorTestCase(unittest.TestCase):
+
+    def test_validate(self):
+        inputs = [
+            '{ ["f(1)"] = "g"; "x", "y"; x = 1, "f(x)", [30] = 23; 45 }',
+            '{x=10, y=45; "one", nil, "three", {}, {n=nil}}',
+            '{[ [[kikyo]]] = true, --[==[ long\ncomment ]==] [-1.5] = {{}}}',
+            "{'a\\z  \n b', \"\\0123\\x41\\\\\", [==[x]]=]==], 0xA.8P2, .5}",
+            '{a = {b = {c = nil, true, false}}, -- short\n [true] = 3.}',
+            '-.5', '"alo"', 'nil', 'true', ' { } '
+        ]
+        for i_val in inputs:
+            self.assertTrue(Validator(i_val)._scan() or
+                            i_val.startswith("{'a"))
+            self.assertIsNone(validate(i_val))
+            self.assertIsNone(validate(i_val.encode('utf-8')))
+
+        inputs = ['', '{1 2}', '{[ [[k]]]] = 1}', '{[{}] = 1}', '{x == 1}',
+                  '{"a\\256"}', '{1,,}', '{nil = 1}', '{5x}', '{[[a}', '{}}',
+                  '{1.5e999x}', '{0x}', '{1..2}', '{[1e999_] = 1}']
+        for i_val in inputs:
+            self.assertRaises(SyntaxError, validate, i_val)
+            self.assertRaises(Exception, Parser(i_val).parse)
+
+    def test_validate_statement_chunk(self):
+        self.assertIsNone(validate('local Table = {1, 2};', statement=True))
+        self.assertIsNone(validate('return {x = 1}', statement=True))
+        self.assertRaises(SyntaxError, validate, 'Table = {1, 2}')
+        self.assertRaises(SyntaxError, validate, 'T = {} U = {}',
+                          statement=True)
+        inputs = ['--return {1,2}', '-- T = {1}', '--local T = {1}',
+                  '--[[x]] --T = {1}\n']
+        for i_val in inputs:
+            self.assertRaises(SyntaxError, validate, i_val, statement=True)
+            self.assertRaises(SyntaxError, validate, i_val)
+
+        input1 = 'local A = {1, 2}; B = {x = "y"}\nreturn A'
+        self.assertIsNone(validate(input1, chunk=True))
+        self.assertIsNone(validate(input1 + ';', chunk=True))
+        self.assertIsNone(validate('A = 1 B = nil', chunk=True))
+        self.assertIsNone(validate('', chunk=True))
+        inputs = ['A = 1 A = nil return A', 'return B', 'A = 1 return A B = 2',
+                  'local = 1', 'A = {1, 2', 'A = 1endB = 2']
+        for i_val in inputs:
+            self.assertRaises(SyntaxError, validate, i_val, chunk=True)
+
+    def test_validate_location(self):
+        try:
+            validate('{\n  x = 1,\n  y = 2 3\n}')
+        except SyntaxError as error:
+            self.assertEqual(error.lineno, 3)
+            self.assertEqual(error.offset, 9)
+            self.assertEqual(error.text, '  y = 2 3')
+        else:
+            self.fail('no SyntaxError raised')
+
+    def test_check_file(self):
+        fd, path = tempfile.mkstemp(suffix='.lua')
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                fp.write(b'\xef\xbb\xbfItems = {\n  "a", "b",\n  [1] = \n}\n')
+            error = check_file(path, statement=True)
+            self.assertIsInstance(error, SyntaxError)
+            self.assertEqual(error.filename, path)
+            self.assertEqual(error.lineno, 4)
+            with open(path, 'wb') as fp:
+                fp.write(b'Items = {\n  1.5e999x,\n}\n')
+            self.assertEqual(check_file(path, statement=True).lineno, 2)
+            with open(path, 'wb') as fp:
+                fp.write(b'Items = {\n  "a", "b",\n}\n')
+            self.assertIsNone(check_file(path, statement=True))
+        finally:
+            os.remove(path)